@@ -14,6 +14,8 @@ export interface HttpScrapeInput {
   url: string;
   selectors: Record<string, unknown>;
   targetCount: number;
+  /** Return items as value arrays aligned with `fields` instead of objects */
+  columnar?: boolean;
 }
 
 export interface HttpScrapeResult {
@@ -22,6 +24,8 @@ export interface HttpScrapeResult {
   count: number;
   needs_browser: boolean;
   reason: string | null;
+  /** Field order of each item array (columnar requests only) */
+  fields?: string[];
 }
 
 export class HttpScraperBridge {
@@ -34,7 +38,7 @@ export class HttpScraperBridge {
   }
 
   /**
-   * Scrape a single URL using HTTP + BeautifulSoup4.
+   * Scrape a single URL using HTTP + lxml.
    * Returns result indicating if browser fallback is needed.
    */
   async scrape(input: HttpScrapeInput): Promise<HttpScrapeResult> {
@@ -161,7 +165,7 @@ export class HttpScraperBridge {
    */
   async testConnection(): Promise<{ available: boolean; error?: string }> {
     return new Promise((resolve) => {
-      const proc = spawn(this.pythonPath, ['-c', 'import requests; import bs4; print("ok")'], {
+      const proc = spawn(this.pythonPath, ['-c', 'import requests; import lxml; import cssselect; print("ok")'], {
         timeout: 5000,
       });
 
@@ -182,7 +186,7 @@ export class HttpScraperBridge {
         } else {
           resolve({
             available: false,
-            error: stderr || 'Python dependencies not available. Run: pip install requests beautifulsoup4',
+            error: stderr || 'Python dependencies not available. Run: pip install requests lxml cssselect',
           });
         }
       });
@@ -1,40 +1,231 @@
 #!/usr/bin/env python3
 """
-Fast HTTP-based scraper using requests + BeautifulSoup4.
+Fast HTTP-based scraper using requests + lxml (CSS selectors via cssselect).
+Simple selectors on UTF-8 pages use selectolax's Lexbor parser when installed.
 Falls back to browser if results are insufficient.
 """
 
+import codecs
 import json
+import queue
+import re
 import sys
-from typing import Optional, Dict, List, Any
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Dict, List, Tuple, Any
 import requests
-from bs4 import BeautifulSoup
+from cssselect import ExpressionError, HTMLTranslator, parse as parse_css
+from cssselect.parser import CombinedSelector
+from lxml import etree
+from lxml import html as lxml_html
+from requests.adapters import HTTPAdapter
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+
+try:
+    import orjson
+except ImportError:  # stdlib json fallback; orjson only speeds up serve() I/O
+    orjson = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # lxml handles every page without it
+    LexborHTMLParser = None
 
 TIMEOUT = 10  # seconds
+POOL_CONNECTIONS = 100  # hosts with a cached connection pool
+POOL_MAXSIZE = 50  # keep-alive connections kept per host
+SERVE_WORKERS = 16  # requests scraped concurrently in --serve mode
+CHUNK_SIZE = 64 * 1024  # bytes read per iteration while streaming a response
+MAX_BODY_BYTES = 10 * 1024 * 1024  # larger pages are left to the browser
+STATUS_RETRIES = 2  # extra attempts after a transient gateway error
+RETRY_STATUSES = frozenset({502, 503, 504})
+RETRY_BACKOFF = 0.3  # seconds slept before each retry
+MIN_RETRY_SECONDS = 1  # a retry needs at least this much of TIMEOUT left
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
+# Common bot detection indicators (lowercase ASCII bytes, matched against
+# the raw response body so it never has to be decoded), built once at import
+BOT_INDICATORS = (
+    b'captcha',
+    b'cloudflare',
+    b'access denied',
+    b'robot check',
+    b'please verify you are human',
+    b'enable javascript',
+    b'browser check',
+    b'ddos protection',
+)
+BOT_SCAN_LIMIT = 8192  # leading bytes of the body searched for indicators
+
+# Config keys that name the product container rather than a field
+CONTAINER_KEYS = ('productContainer', 'container', 'product_container')
+
+# How a field value is read from its matched element
+KIND_TEXT = 0  # 'text' / 'innerText'
+KIND_ATTR = 1  # any attribute, e.g. 'href' or 'src'
+KIND_HTML = 2  # 'innerHTML' (serialized element)
+
+# Low-cardinality fields (matched case-insensitively) whose values repeat
+# across items and are shared via HttpScraper._intern
+INTERN_FIELDS = frozenset({
+    'brand',
+    'category',
+    'currency',
+    'color',
+    'colour',
+    'size',
+    'availability',
+    'stock',
+    'badge',
+})
+INTERN_CACHE_SIZE = 10000  # distinct values kept per scraper
+
+# Charset sources, in the order browsers honour them
+CHARSET_HEADER_RE = re.compile(r'charset=["\']?([\w.:-]+)', re.IGNORECASE)
+CHARSET_META_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w.:-]+)', re.IGNORECASE)
+CHARSET_SCAN_LIMIT = 8192  # leading bytes searched for a <meta> charset
+
+CSS_TRANSLATOR = HTMLTranslator()
+
+# Visible text under an element (comments, scripts and styles excluded)
+TEXT_NODES_STEP = 'descendant-or-self::text()[not(parent::script) and not(parent::style)]'
+
+# Tag/class/id selectors with descendant or child combinators only; these
+# behave identically in Lexbor and lxml
+SIMPLE_SELECTOR_RE = re.compile(r'^[\w\-.#\s>]+$')
+
+
+def _loads(data: bytes) -> Any:
+    """Decode one JSON request line (orjson when available)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(obj: Any) -> bytes:
+    """Encode one JSON response as UTF-8 bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+@lru_cache(maxsize=512)
+def _compile(sel: str) -> etree.XPath:
+    """
+    Compile a container selector to an XPath callable once; configs reuse the
+    same selectors across requests.
+    """
+    return etree.XPath(CSS_TRANSLATOR.css_to_xpath(sel, prefix='descendant::'))
+
+
+def _subject_xpath(tree: Any) -> str:
+    """
+    Translate a parsed selector right to left: the subject compound, with the
+    compounds to its left as ancestor/sibling predicates. Unlike cssselect's
+    own left-to-right paths, those predicates may match outside the context
+    node, as in querySelector() and soupsieve.
+    """
+    if not isinstance(tree, CombinedSelector):
+        return str(CSS_TRANSLATOR.xpath(tree))
+
+    subject = _subject_xpath(tree.subselector)
+    left = _subject_xpath(tree.selector)
+
+    if tree.combinator == '>':
+        return f'{subject}[parent::{left}]'
+    if tree.combinator == '+':
+        return f'{subject}[preceding-sibling::*[1][self::{left}]]'
+    if tree.combinator == '~':
+        return f'{subject}[preceding-sibling::{left}]'
+    return f'{subject}[ancestor::{left}]'
+
+
+@lru_cache(maxsize=512)
+def _compile_field(sel: str, kind: int, attr: str) -> Tuple[etree.XPath, etree.XPath]:
+    """
+    Compile a field selector into (values, first) XPath callables.
+
+    `first` returns the first matching descendant of the container. `values`
+    fuses that match with the value read, returning its text nodes (KIND_TEXT),
+    attribute value (KIND_ATTR) or the element itself (KIND_HTML), so each
+    field costs one libxml2 evaluation per container.
+    """
+    paths = []
+    for selector in parse_css(sel):
+        if selector.pseudo_element:
+            raise ExpressionError(f'Pseudo-element ::{selector.pseudo_element} is not supported')
+        paths.append('descendant::' + _subject_xpath(selector.parsed_tree))
+
+    first = '(' + ' | '.join(paths) + ')[1]'
+
+    if kind == KIND_TEXT:
+        values = first + '/' + TEXT_NODES_STEP
+    elif kind == KIND_ATTR:
+        values = first + '/@*[name()=' + CSS_TRANSLATOR.xpath_literal(attr) + ']'
+    else:
+        values = first
+
+    return etree.XPath(values, smart_strings=False), etree.XPath(first)
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """
+    Shared requests session for every HttpScraper in the process, so keep-alive
+    connections survive across serve() requests and scraper instances.
+    """
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update({
+                'User-Agent': USER_AGENT,
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+                'Accept-Language': 'en-US,en;q=0.9',
+                # Only codings urllib3 can decode here (br/zstd need brotli/zstandard)
+                'Accept-Encoding': DEFAULT_ACCEPT_ENCODING,
+                'Connection': 'keep-alive',
+                'Upgrade-Insecure-Requests': '1',
+                'Sec-Fetch-Dest': 'document',
+                'Sec-Fetch-Mode': 'navigate',
+                'Sec-Fetch-Site': 'none',
+                'Sec-Fetch-User': '?1',
+                'Cache-Control': 'max-age=0',
+            })
+
+            # requests defaults to 10 host pools of 10 connections; batch runs hit far
+            # more hosts than that and would otherwise re-handshake TCP+TLS.
+            # No transport-level retries: urllib3 would give every attempt the
+            # full TIMEOUT (see HttpScraper._get for the budgeted status retry)
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+
+            _session = session
+
+        return _session
+
 
 class HttpScraper:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': USER_AGENT,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Sec-Fetch-User': '?1',
-            'Cache-Control': 'max-age=0',
-        })
-
-    def scrape(self, url: str, selectors: Dict[str, Any], target_count: int) -> Dict[str, Any]:
+        self.session = _get_session()
+        self._interned: Dict[str, str] = {}
+
+    def scrape(self, url: str, selectors: Dict[str, Any], target_count: int,
+               columnar: bool = False) -> Dict[str, Any]:
         """
         Attempt HTTP scrape with given selectors.
 
+        With columnar=True, items are value lists aligned with an extra "fields"
+        key (null where a field matched nothing) instead of one dict per item,
+        which is cheaper to build and serialize for large listings.
+
         Returns:
             {
                 "success": bool,
@@ -45,27 +236,31 @@ class HttpScraper:
             }
         """
         try:
-            response = self.session.get(url, timeout=TIMEOUT, allow_redirects=True)
-            response.raise_for_status()
+            with self._get(url) as response:
+                response.raise_for_status()
+                content_type = response.headers.get('Content-Type', '')
+                body, abort_reason = self._read_body(response)
 
-            # Check for common bot detection responses
-            if self._is_bot_blocked(response):
+            # Bot detection or an oversized page ended the download early
+            if abort_reason:
                 return {
                     "success": False,
                     "items": [],
                     "count": 0,
                     "needs_browser": True,
-                    "reason": "bot_detection"
+                    "reason": abort_reason
                 }
 
-            soup = BeautifulSoup(response.text, 'html.parser')
-            items = self._extract_items(soup, selectors)
+            if columnar:
+                fields, items = self._extract_rows(body, content_type, selectors)
+            else:
+                items = self._extract_items(body, content_type, selectors)
 
             count = len(items)
 
             # Determine if we need browser fallback
             if count == 0:
-                return {
+                result = {
                     "success": False,
                     "items": [],
                     "count": 0,
@@ -73,7 +268,7 @@ class HttpScraper:
                     "reason": "no_items_found"
                 }
             elif count < target_count:
-                return {
+                result = {
                     "success": True,
                     "items": items,
                     "count": count,
@@ -81,7 +276,7 @@ class HttpScraper:
                     "reason": f"below_target_{count}/{target_count}"
                 }
             else:
-                return {
+                result = {
                     "success": True,
                     "items": items,
                     "count": count,
@@ -89,6 +284,11 @@ class HttpScraper:
                     "reason": None
                 }
 
+            if columnar:
+                result["fields"] = fields
+
+            return result
+
         except requests.Timeout:
             return {
                 "success": False,
@@ -114,97 +314,297 @@ class HttpScraper:
                 "reason": f"parse_error: {str(e)}"
             }
 
-    def _is_bot_blocked(self, response: requests.Response) -> bool:
-        """Check if the response indicates bot detection."""
-        text_lower = response.text.lower()
-
-        # Common bot detection indicators
-        bot_indicators = [
-            'captcha',
-            'cloudflare',
-            'access denied',
-            'robot check',
-            'please verify you are human',
-            'enable javascript',
-            'browser check',
-            'ddos protection',
-        ]
+    def _get(self, url: str) -> requests.Response:
+        """
+        Start a streamed GET. Transient gateway errors (RETRY_STATUSES) are retried
+        only within what is left of the TIMEOUT budget; connection errors and
+        timeouts are not retried, so an unreachable host fails after one TIMEOUT.
+        """
+        deadline = time.monotonic() + TIMEOUT
+        response = self.session.get(url, timeout=TIMEOUT, allow_redirects=True, stream=True)
+
+        for _ in range(STATUS_RETRIES):
+            remaining = deadline - time.monotonic() - RETRY_BACKOFF
+            if response.status_code not in RETRY_STATUSES or remaining < MIN_RETRY_SECONDS:
+                break
+
+            response.close()
+            time.sleep(RETRY_BACKOFF)
+
+            # Connect and first response byte share the remaining budget
+            attempt_timeout = (remaining / 2, remaining / 2)
+            response = self.session.get(url, timeout=attempt_timeout, allow_redirects=True, stream=True)
+
+        return response
+
+    def _read_body(self, response: requests.Response) -> Tuple[bytes, Optional[str]]:
+        """
+        Stream the response body, abandoning the download as soon as the head
+        of the page shows bot detection or the body grows past MAX_BODY_BYTES.
+
+        Returns:
+            (body, abort_reason) - abort_reason is None when the full body was read
+        """
+        content_length = response.headers.get('Content-Length', '')
+        if content_length.isdigit() and int(content_length) > MAX_BODY_BYTES:
+            return b'', 'response_too_large'
+
+        # Chunks are joined once at the end, so the body is copied a single time
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            chunks.append(chunk)
+            size += len(chunk)
+
+            if size > MAX_BODY_BYTES:
+                return b'', 'response_too_large'
 
-        for indicator in bot_indicators:
-            if indicator in text_lower:
-                return True
+            # The bot scan window is complete once the first chunks cover it
+            if size - len(chunk) < BOT_SCAN_LIMIT <= size and self._is_bot_blocked(b''.join(chunks)):
+                return b'', 'bot_detection'
+
+        body = b''.join(chunks)
+
+        # Check for common bot detection responses; longer bodies already had
+        # their head scanned above
+        if len(body) < BOT_SCAN_LIMIT and self._is_bot_blocked(body):
+            return b'', 'bot_detection'
+
+        return body, None
+
+    def _is_bot_blocked(self, body: bytes) -> bool:
+        """Check if the (possibly still partial) response body indicates bot detection."""
+        # Block/captcha markers sit near the top of challenge pages, so only
+        # the head of the body is lowercased and scanned
+        head_lower = body[:BOT_SCAN_LIMIT].lower()
+
+        if any(indicator in head_lower for indicator in BOT_INDICATORS):
+            return True
 
         # Check for very short responses (likely blocked)
-        if len(response.text) < 500:
+        if len(body) < 500:
             return True
 
         return False
 
-    def _extract_items(self, soup: BeautifulSoup, selectors: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Extract product items using CSS selectors from config."""
-        items = []
-
-        # Get product container selector - check multiple possible keys
+    def _get_container_selector(self, selectors: Dict[str, Any]) -> str:
+        """Resolve the product container selector from config ('' if missing)."""
+        # Check multiple possible keys
         container_sel = (
             selectors.get('productContainer') or
             selectors.get('container') or
             selectors.get('product_container')
         )
 
-        if not container_sel:
-            return items
-
         # Handle both string and dict selector formats
         if isinstance(container_sel, dict):
             container_sel = container_sel.get('selector', '')
 
-        if not container_sel:
-            return items
+        return container_sel if isinstance(container_sel, str) else ''
 
-        containers = soup.select(container_sel)
+    def _detect_charset(self, body: bytes, content_type: str) -> str:
+        """
+        Resolve the page charset: the Content-Type header, else a <meta>
+        declaration, else UTF-8 (libxml2 would otherwise assume Latin-1 for
+        undeclared pages). A declaration Python does not know is skipped like a
+        missing one.
+        """
+        match = CHARSET_HEADER_RE.search(content_type)
+        if match and self._known_charset(match.group(1)):
+            return match.group(1)
 
-        for container in containers:
-            item = {}
+        match = CHARSET_META_RE.search(body, 0, CHARSET_SCAN_LIMIT)
+        if match and self._known_charset(match.group(1).decode('ascii')):
+            return match.group(1).decode('ascii')
 
-            # Extract each field using selectors
-            for field, selector in selectors.items():
-                # Skip container fields
-                if field in ('productContainer', 'container', 'product_container'):
-                    continue
+        return 'utf-8'
 
-                sel = ''
+    def _known_charset(self, charset: str) -> bool:
+        """Whether Python's codec registry knows the charset."""
+        try:
+            codecs.lookup(charset)
+        except LookupError:
+            return False
+        return True
+
+    def _parse_html(self, body: bytes, charset: str) -> etree._ElementTree:
+        """Parse the raw body with libxml2, decoding in C."""
+        # Parsers are not shared so concurrent serve() workers never contend
+        parser = lxml_html.HTMLParser(encoding=charset)
+        return lxml_html.document_fromstring(body, parser=parser).getroottree()
+
+    def _intern(self, value: str) -> str:
+        """Return a shared copy of a repeated field value (bounded cache)."""
+        cached = self._interned.get(value)
+        if cached is not None:
+            return cached
+
+        if len(self._interned) < INTERN_CACHE_SIZE:
+            self._interned[value] = value
+        return value
+
+    def _build_plan(self, selectors: Dict[str, Any]) -> List[Tuple[str, int, str, str, bool]]:
+        """
+        Resolve field selectors into (field, kind, selector, attribute, intern)
+        once per scrape, keeping config parsing out of the per-container loop.
+        """
+        plan = []
+
+        for field, selector in selectors.items():
+            # Skip container fields
+            if field in CONTAINER_KEYS:
+                continue
+
+            # Handle both string and dict selector formats
+            if isinstance(selector, dict):
+                sel = selector.get('selector', '')
+                attr = selector.get('attribute') or 'text'
+            elif isinstance(selector, str):
+                sel = selector
                 attr = 'text'
+            else:
+                continue
 
-                if isinstance(selector, dict):
-                    sel = selector.get('selector', '')
-                    attr = selector.get('attribute', 'text')
-                elif isinstance(selector, str):
-                    sel = selector
-                    attr = 'text'
-                else:
+            if not sel:
+                continue
+
+            if attr in ('text', 'innerText'):
+                kind = KIND_TEXT
+            elif attr == 'innerHTML':
+                kind = KIND_HTML
+            else:
+                kind = KIND_ATTR
+
+            plan.append((field, kind, sel, attr, field.lower() in INTERN_FIELDS))
+
+        return plan
+
+    def _extract_rows(self, body: bytes, content_type: str,
+                      selectors: Dict[str, Any]) -> Tuple[List[str], List[List[Optional[str]]]]:
+        """
+        Extract product items using CSS selectors from config, column-aligned:
+        one row per item with a value per field (None where nothing matched).
+        """
+        container_sel = self._get_container_selector(selectors)
+        if not container_sel:
+            return [], []
+
+        plan = self._build_plan(selectors)
+        fields = [entry[0] for entry in plan]
+        charset = self._detect_charset(body, content_type)
+
+        # Lexbor reads bytes as UTF-8 and is not a full soupsieve/cssselect
+        # match for pseudo-classes or attribute selectors. Its innerHTML
+        # serialization differs from lxml's (entities, boolean attributes)
+        use_lexbor = (
+            LexborHTMLParser is not None and
+            codecs.lookup(charset).name in ('utf-8', 'ascii') and
+            all(SIMPLE_SELECTOR_RE.match(sel) for sel in [container_sel] + [entry[2] for entry in plan]) and
+            all(entry[1] != KIND_HTML for entry in plan)
+        )
+
+        if use_lexbor:
+            tree = LexborHTMLParser(body)
+
+            # Lexbor keeps <template> contents out of the tree, lxml reads them
+            # as text; such pages take the lxml path so output never depends
+            # on whether selectolax is installed
+            if tree.css_first(f'{container_sel} template') is None:
+                return fields, self._extract_rows_lexbor(tree, container_sel, plan)
+
+        return fields, self._extract_rows_lxml(self._parse_html(body, charset), container_sel, plan)
+
+    def _extract_rows_lxml(self, tree: etree._ElementTree, container_sel: str,
+                           plan: List[Tuple[str, int, str, str, bool]]) -> List[List[Optional[str]]]:
+        """Row extraction over an lxml tree with compiled, fused XPath per field."""
+        compiled = [(kind,) + _compile_field(sel, kind, attr) + (shared,) for _, kind, sel, attr, shared in plan]
+        rows = []
+
+        for container in _compile(container_sel)(tree):
+            row = []
+
+            # Extract each field using the pre-resolved plan
+            for kind, values, first, shared in compiled:
+                matches = values(container)
+
+                if not matches:
+                    # A matched element with no text/attribute still yields ''
+                    row.append('' if kind != KIND_HTML and first(container) else None)
                     continue
 
-                if not sel:
+                if kind == KIND_TEXT:
+                    value = ''.join(text.strip() for text in matches)
+                elif kind == KIND_ATTR:
+                    value = matches[0]
+                else:
+                    value = etree.tostring(matches[0], encoding='unicode', method='html', with_tail=False)
+
+                row.append(self._intern(value) if shared else value)
+
+            # Only add if we extracted at least one meaningful field
+            if any(row):
+                rows.append(row)
+
+        return rows
+
+    def _extract_rows_lexbor(self, tree: Any, container_sel: str,
+                             plan: List[Tuple[str, int, str, str, bool]]) -> List[List[Optional[str]]]:
+        """
+        Row extraction over a Lexbor tree; same values as the lxml path for
+        text and attribute fields (innerHTML plans never take this path).
+        """
+        rows = []
+
+        # Lexbor's text() would include script/style contents; the slower
+        # filtered walk is only needed for containers that hold any
+        any_code = tree.css_first(f'{container_sel} script, {container_sel} style') is not None
+
+        for container in tree.css(container_sel):
+            row = []
+            container_id = container.mem_id
+            has_code = any_code and container.css_first('script, style') is not None
+
+            for _, kind, sel, attr, shared in plan:
+                element = container.css_first(sel)
+
+                # Unlike select(), Lexbor also matches the context node itself
+                if element is not None and element.mem_id == container_id:
+                    element = next((match for match in container.css(sel) if match.mem_id != container_id), None)
+
+                if element is None:
+                    row.append(None)
                     continue
 
-                element = container.select_one(sel)
-                if element:
-                    if attr == 'text' or attr == 'innerText':
-                        item[field] = element.get_text(strip=True)
-                    elif attr == 'href':
-                        item[field] = element.get('href', '')
-                    elif attr == 'src':
-                        item[field] = element.get('src', '')
-                    elif attr == 'innerHTML':
-                        item[field] = str(element)
+                if kind == KIND_TEXT:
+                    if has_code:
+                        value = ''.join(
+                            node.text(deep=False, strip=True)
+                            for node in element.traverse(include_text=True)
+                            if node.tag == '-text' and node.parent.tag not in ('script', 'style')
+                        )
                     else:
-                        item[field] = element.get(attr, '')
+                        value = element.text(deep=True, separator='', strip=True)
+                else:
+                    # libxml2 gives valueless attributes (e.g. "disabled") their own name
+                    value = element.attributes.get(attr, '')
+                    if value is None:
+                        value = attr
+
+                row.append(self._intern(value) if shared else value)
 
             # Only add if we extracted at least one meaningful field
-            if item and any(v for v in item.values() if v):
-                items.append(item)
+            if any(row):
+                rows.append(row)
 
-        return items
+        return rows
+
+    def _extract_items(self, body: bytes, content_type: str, selectors: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Extract product items as dicts, omitting fields that matched nothing."""
+        fields, rows = self._extract_rows(body, content_type, selectors)
+        return [
+            {field: value for field, value in zip(fields, row) if value is not None}
+            for row in rows
+        ]
 
 
 def serve():
@@ -212,25 +612,38 @@ def serve():
     Persistent server mode for Node.js worker pool.
     Reads JSON requests from stdin, writes JSON responses to stdout.
     Much faster than spawning new process per request (~300ms -> ~10ms).
+
+    Up to SERVE_WORKERS requests are scraped concurrently, but responses are
+    written in request order; an "id" sent with a request is echoed on its response.
     """
     scraper = HttpScraper()
 
-    # Read lines from stdin continuously
-    for line in sys.stdin:
-        line = line.strip()
-        if not line:
-            continue
+    # Futures in request order; None tells the writer that input has ended
+    pending: "queue.Queue[Optional[Future]]" = queue.Queue()
 
-        try:
-            request = json.loads(line)
+    def write_responses():
+        # Single writer, so responses keep request order and never interleave
+        while True:
+            future = pending.get()
+            if future is None:
+                return
 
-            # Handle shutdown command
-            if request.get('command') == 'shutdown':
-                break
+            # Output result as single JSON line
+            sys.stdout.buffer.write(_dumps(future.result()) + b"\n")
+            sys.stdout.buffer.flush()
 
+    def respond(result: Dict[str, Any]):
+        # Queue a response that needs no scraping behind the in-flight ones
+        future = Future()
+        future.set_result(result)
+        pending.put(future)
+
+    def handle(request: Dict[str, Any]) -> Dict[str, Any]:
+        try:
             url = request.get('url', '')
             selectors = request.get('selectors', {})
             target_count = request.get('targetCount', 10)
+            columnar = bool(request.get('columnar', False))
 
             if not url:
                 result = {
@@ -241,27 +654,61 @@ def serve():
                     "reason": "missing_url"
                 }
             else:
-                result = scraper.scrape(url, selectors, target_count)
+                result = scraper.scrape(url, selectors, target_count, columnar)
 
-            # Output result as single JSON line
-            print(json.dumps(result), flush=True)
-
-        except json.JSONDecodeError as e:
-            print(json.dumps({
-                "success": False,
-                "items": [],
-                "count": 0,
-                "needs_browser": True,
-                "reason": f"json_decode_error: {str(e)}"
-            }), flush=True)
         except Exception as e:
-            print(json.dumps({
+            result = {
                 "success": False,
                 "items": [],
                 "count": 0,
                 "needs_browser": True,
                 "reason": f"worker_error: {str(e)}"
-            }), flush=True)
+            }
+
+        if request.get('id') is not None:
+            result["id"] = request['id']
+
+        return result
+
+    writer = threading.Thread(target=write_responses, daemon=True)
+    writer.start()
+
+    with ThreadPoolExecutor(max_workers=SERVE_WORKERS) as executor:
+        # Read lines from stdin continuously (as bytes; the JSON codec decodes UTF-8)
+        for line in sys.stdin.buffer:
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                request = _loads(line)
+
+                # Handle shutdown command
+                if request.get('command') == 'shutdown':
+                    break
+
+                pending.put(executor.submit(handle, request))
+
+            except json.JSONDecodeError as e:
+                respond({
+                    "success": False,
+                    "items": [],
+                    "count": 0,
+                    "needs_browser": True,
+                    "reason": f"json_decode_error: {str(e)}"
+                })
+            except Exception as e:
+                respond({
+                    "success": False,
+                    "items": [],
+                    "count": 0,
+                    "needs_browser": True,
+                    "reason": f"worker_error: {str(e)}"
+                })
+
+    # Every accepted request gets its response before shutdown
+    pending.put(None)
+    writer.join()
 
 
 def main():
@@ -280,9 +727,10 @@ def main():
         url = input_data['url']
         selectors = input_data['selectors']
         target_count = input_data.get('targetCount', 10)
+        columnar = bool(input_data.get('columnar', False))
 
         scraper = HttpScraper()
-        result = scraper.scrape(url, selectors, target_count)
+        result = scraper.scrape(url, selectors, target_count, columnar)
 
         print(json.dumps(result))
 